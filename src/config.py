@@ -1,4 +1,5 @@
 import os
+from typing import Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -16,6 +17,17 @@ class Settings(BaseSettings):
 
     LOG_LEVEL: str = "INFO"
 
+    INLINE_CACHE_TIME: int = 300
+
+    UPDATE_CONCURRENCY: int = 8
+    UPDATE_QUEUE_SIZE: int = 100
+    UPDATE_CHAT_QUEUE_SIZE: int = 5
+    UPDATE_OVERFLOW: Literal["drop", "defer"] = "drop"
+
+    TRACING_ENABLED: bool = False
+    SLOW_REQUEST_MS: int = 1000
+    ADMIN_TOKEN: str = ""
+
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", extra="ignore"
     )
@@ -1,41 +1,130 @@
 import asyncio
 import os
+import secrets
 import uvicorn
-from fastapi import FastAPI
+from datetime import datetime
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 from aiogram.utils.chat_action import ChatActionMiddleware
 
 from src.config import settings
+from src.startup import startup
 from src.logger import setup_logger
-from src.database.engine import init_db
+from src.database.engine import engine, init_db
+from src.poweron.cache import memory_cache
 from src.poweron.scheduler import check_updates_loop
+from src.poweron.service import PowerService
+from src.profiler import profiler
+from src.tracing import instrument_engine
 from src.telegram.bot import bot, dp
-from src.telegram.middlewares import AntiFloodMiddleware
+from src.telegram.middlewares import (
+    AntiFloodMiddleware,
+    ConcurrencyMiddleware,
+    HandlerSpanMiddleware,
+    SpanMiddleware,
+    TracingMiddleware,
+    TracingRequestMiddleware,
+)
 from src.telegram.handlers import router as telegram_router
 
 logger = setup_logger(__name__, settings.LOG_LEVEL)
 
 
+drop_overflow = settings.UPDATE_OVERFLOW == "drop"
+concurrency = ConcurrencyMiddleware(
+    limit=settings.UPDATE_CONCURRENCY,
+    queue_size=settings.UPDATE_QUEUE_SIZE,
+    chat_queue_size=settings.UPDATE_CHAT_QUEUE_SIZE,
+    drop_overflow=drop_overflow,
+)
+
+anti_flood = AntiFloodMiddleware(limit=10, window=10, ban_time=300)
+
 dp.include_router(telegram_router)
-dp.message.middleware(AntiFloodMiddleware(limit=10, window=10, ban_time=300))
-dp.message.middleware(ChatActionMiddleware())
+
+if settings.TRACING_ENABLED:
+    instrument_engine(engine)
+    bot.session.middleware(TracingRequestMiddleware())
+    dp.update.outer_middleware(TracingMiddleware(slow_ms=settings.SLOW_REQUEST_MS))
+    dp.update.outer_middleware(SpanMiddleware(concurrency))
+    dp.message.middleware(SpanMiddleware(anti_flood))
+    dp.message.middleware(SpanMiddleware(ChatActionMiddleware()))
+    dp.message.middleware(HandlerSpanMiddleware())
+    dp.inline_query.middleware(HandlerSpanMiddleware())
+else:
+    dp.update.outer_middleware(concurrency)
+    dp.message.middleware(anti_flood)
+    dp.message.middleware(ChatActionMiddleware())
+
+background_tasks: list[asyncio.Task] = []
+
+
+async def start_services():
+    async with startup.phase("init_db"):
+        await init_db()
+
+    async with startup.phase("preload_schedules"):
+        count = await PowerService.preload_schedules()
+        logger.info(f"Preloaded {count} cached schedules")
+
+    async with startup.phase("preload_users"):
+        count = await PowerService.preload_users()
+        logger.info(f"Preloaded {count} users")
+
+    async with startup.phase("preload_bans"):
+        count = await anti_flood.preload()
+        logger.info(f"Preloaded {count} active bans")
+
+    async with startup.phase("render_captions"):
+        count = memory_cache.render_all()
+        logger.info(f"Pre-rendered {count} schedules")
+
+    # In "defer" mode polling stops fetching while the queue is full,
+    # so the excess stays on Telegram's side instead of being dropped
+    tasks_limit = (
+        None
+        if drop_overflow
+        else settings.UPDATE_CONCURRENCY + settings.UPDATE_QUEUE_SIZE
+    )
+    polling_task = asyncio.create_task(
+        dp.start_polling(
+            bot, drop_pending_updates=True, tasks_concurrency_limit=tasks_limit
+        ),
+        name="polling",
+    )
+    monitor_task = asyncio.create_task(check_updates_loop(bot), name="monitor")
+    background_tasks.extend([polling_task, monitor_task])
+
+    startup.mark_ready()
+
+
+async def run_startup():
+    try:
+        await start_services()
+    except Exception as e:
+        logger.error(f"Startup failed: {e}")
+        if startup.error is None:
+            startup.error = str(e)
+
+
+def stopped_services() -> list[str]:
+    return [task.get_name() for task in background_tasks if task.done()]
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     logger.info("Starting bot services...")
-    await init_db()
-
-    polling_task = asyncio.create_task(dp.start_polling(bot, drop_pending_updates=True))
-    monitor_task = asyncio.create_task(check_updates_loop(bot))
+    startup_task = asyncio.create_task(run_startup())
 
     yield
 
     logger.info("Stopping bot services...")
-    polling_task.cancel()
-    monitor_task.cancel()
+    startup_task.cancel()
+    for task in background_tasks:
+        task.cancel()
     try:
-        await asyncio.gather(polling_task, monitor_task, return_exceptions=True)
+        await asyncio.gather(startup_task, *background_tasks, return_exceptions=True)
     except Exception as e:
         logger.error(f"Error during shutdown: {e}")
     await bot.session.close()
@@ -46,7 +135,71 @@ app = FastAPI(title="poweron-telegram-bot", lifespan=lifespan)
 
 @app.get("/")
 async def health_check():
-    return {"status": "ok", "bot": "running"}
+    if startup.error:
+        return JSONResponse(
+            {"status": "error", "bot": "failed", "error": startup.error},
+            status_code=503,
+        )
+    stopped = stopped_services()
+    if stopped:
+        return JSONResponse(
+            {"status": "error", "bot": "stopped", "stopped_services": stopped},
+            status_code=503,
+        )
+    return {"status": "ok", "bot": "running" if startup.ready else "starting"}
+
+
+@app.get("/livez")
+async def livez():
+    # Neither a failed startup nor a stopped polling/monitor task recovers
+    # on its own, so let the platform restart us
+    if startup.error:
+        return JSONResponse({"status": "error", "error": startup.error}, 503)
+    stopped = stopped_services()
+    if stopped:
+        return JSONResponse({"status": "error", "stopped_services": stopped}, 503)
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    report = startup.report()
+    stopped = stopped_services()
+    ready = startup.ready and not stopped
+
+    if stopped:
+        report["status"] = "degraded"
+        report["stopped_services"] = stopped
+
+    return JSONResponse(report, status_code=200 if ready else 503)
+
+
+@app.get("/stats")
+async def stats():
+    return {"updates": concurrency.stats()}
+
+
+@app.get("/debug/profile")
+async def profile(
+    seconds: float = Query(10, gt=0, le=60),
+    x_admin_token: str = Header(""),
+):
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404)
+    if not secrets.compare_digest(
+        x_admin_token.encode(), settings.ADMIN_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=403)
+    if profiler.running:
+        raise HTTPException(status_code=409, detail="Profiling already in progress")
+
+    logger.info(f"Capturing event loop profile for {seconds}s...")
+    folded = await profiler.capture(seconds)
+    filename = f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}.folded"
+
+    return PlainTextResponse(
+        folded, headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,72 @@
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Dict
+
+from src.poweron.utils import format_schedule
+
+CACHE_TTL = 1800
+
+
+class MemoryCache:
+    def __init__(self):
+        self.schedules: Dict[tuple[str, str], tuple[dict, datetime]] = {}
+        self.renders: Dict[tuple[str, str], str] = {}
+        self.users: Dict[int, str] = {}
+        self.users_loaded = False
+        self.groups: list[str] = []
+        self.next_refresh: datetime | None = None
+
+    def get_schedule(self, date_str: str, group: str):
+        return self.schedules.get((date_str, group), (None, None))
+
+    def set_schedule(
+        self, date_str: str, group: str, times: dict, updated_at: datetime
+    ):
+        key = (date_str, group)
+        cached = self.schedules.get(key)
+
+        if cached is None or cached[0] != times:
+            self.renders.pop(key, None)
+
+        self.schedules[key] = (times, updated_at)
+
+        if group not in self.groups:
+            self.groups = sorted(self.groups + [group])
+
+        self.prune()
+
+    def match_groups(self, prefix: str) -> list[str]:
+        start = bisect_left(self.groups, prefix)
+        matches = []
+
+        for group in self.groups[start:]:
+            if not group.startswith(prefix):
+                break
+            matches.append(group)
+
+        return matches
+
+    def prune(self):
+        oldest = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+        for key in [key for key in self.schedules if key[0] < oldest]:
+            del self.schedules[key]
+            self.renders.pop(key, None)
+
+    def render(self, date_str: str, group: str, times: dict) -> str:
+        key = (date_str, group)
+        text = self.renders.get(key)
+
+        if text is None:
+            text = format_schedule(times)
+            self.renders[key] = text
+
+        return text
+
+    def render_all(self) -> int:
+        for (date_str, group), (times, _) in self.schedules.items():
+            self.render(date_str, group, times)
+
+        return len(self.renders)
+
+
+memory_cache = MemoryCache()
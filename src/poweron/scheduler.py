@@ -1,5 +1,5 @@
 import asyncio
-from datetime import datetime
+from datetime import datetime, timedelta
 from aiogram import Bot
 from aiogram.exceptions import (
     TelegramForbiddenError,
@@ -12,6 +12,7 @@ from src.config import settings
 from src.logger import setup_logger
 from src.database.engine import async_session
 from src.database.models import ScheduleState, User
+from src.poweron.cache import memory_cache
 from src.poweron.service import PowerService
 
 logger = setup_logger(__name__, settings.LOG_LEVEL)
@@ -44,6 +45,7 @@ async def send_notification(bot: Bot, date: datetime):
             async with async_session() as session:
                 await session.execute(delete(User).where(User.chat_id == user.chat_id))
                 await session.commit()
+            memory_cache.users.pop(user.chat_id, None)
 
         except TelegramRetryAfter as e:
             await asyncio.sleep(e.retry_after)
@@ -64,6 +66,7 @@ async def check_updates_loop(bot: Bot):
 
             if not result or not result.events:
                 logger.info("The schedule is empty or unavailable.")
+                memory_cache.next_refresh = datetime.now() + timedelta(seconds=600)
                 await asyncio.sleep(600)
                 continue
 
@@ -99,4 +102,5 @@ async def check_updates_loop(bot: Bot):
         except Exception as e:
             logger.error(f"Monitoring error: {e}")
 
+        memory_cache.next_refresh = datetime.now() + timedelta(seconds=600)
         await asyncio.sleep(600)
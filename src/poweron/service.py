@@ -10,7 +10,9 @@ from src.logger import setup_logger
 from src.poweron.schemas import ScheduleResponse
 from src.database.engine import async_session
 from src.database.models import User, ScheduleCache
-from src.poweron.utils import format_schedule, format_date_ua, get_current_status
+from src.poweron.cache import CACHE_TTL, memory_cache
+from src.poweron.utils import format_date_ua, get_current_status
+from src.tracing import span
 
 logger = setup_logger(__name__, settings.LOG_LEVEL)
 
@@ -29,30 +31,36 @@ class PowerService:
 
     @staticmethod
     async def get_schedule_from_cache(date_str: str, group: str = "3.2"):
-        async with async_session() as session:
-            result = await session.execute(
-                select(ScheduleCache).where(
-                    ScheduleCache.date_graph == date_str, ScheduleCache.group == group
+        cached_times, cache_time = memory_cache.get_schedule(date_str, group)
+
+        if cached_times is None:
+            async with async_session() as session:
+                result = await session.execute(
+                    select(ScheduleCache).where(
+                        ScheduleCache.date_graph == date_str,
+                        ScheduleCache.group == group,
+                    )
                 )
-            )
-            cache = result.scalar_one_or_none()
+                cache = result.scalar_one_or_none()
 
-            if cache:
-                cache_time = cache.updated_at
-                if cache_time.tzinfo is None:
-                    cache_time = cache_time.replace(tzinfo=timezone.utc)
-
-                time_diff = (datetime.now(timezone.utc) - cache_time).total_seconds()
-
-                if time_diff < 1800:
-                    logger.info(f"Cache HIT for {date_str} (age: {int(time_diff)}s)")
-                    return json.loads(cache.times_json), cache_time
-                else:
-                    logger.info(
-                        f"Cache EXPIRED for {date_str} (age: {int(time_diff)}s)"
-                    )
+            if not cache:
+                return None, None
+
+            cache_time = cache.updated_at
+            if cache_time.tzinfo is None:
+                cache_time = cache_time.replace(tzinfo=timezone.utc)
+
+            cached_times = json.loads(cache.times_json)
+            memory_cache.set_schedule(date_str, group, cached_times, cache_time)
 
-            return None, None
+        time_diff = (datetime.now(timezone.utc) - cache_time).total_seconds()
+
+        if time_diff < CACHE_TTL:
+            logger.info(f"Cache HIT for {date_str} (age: {int(time_diff)}s)")
+            return cached_times, cache_time
+
+        logger.info(f"Cache EXPIRED for {date_str} (age: {int(time_diff)}s)")
+        return None, None
 
     @staticmethod
     async def save_schedule_to_cache(date_str: str, group: str, times_dict: dict):
@@ -65,10 +73,11 @@ class PowerService:
             cache = result.scalar_one_or_none()
 
             times_json = json.dumps(times_dict, ensure_ascii=False)
+            updated_at = datetime.now(timezone.utc)
 
             if cache:
                 cache.times_json = times_json
-                cache.updated_at = datetime.now(timezone.utc)
+                cache.updated_at = updated_at
                 await session.commit()
                 logger.info(f"Cache UPDATED for {date_str}")
             else:
@@ -76,12 +85,50 @@ class PowerService:
                     date_graph=date_str,
                     group=group,
                     times_json=times_json,
-                    updated_at=datetime.now(timezone.utc),
+                    updated_at=updated_at,
                 )
                 session.add(new_cache)
                 await session.commit()
                 logger.info(f"Cache SAVED for {date_str}")
 
+        memory_cache.set_schedule(date_str, group, times_dict, updated_at)
+
+    @staticmethod
+    async def preload_schedules() -> int:
+        today = datetime.now()
+        dates = [
+            today.strftime("%Y-%m-%d"),
+            (today + timedelta(days=1)).strftime("%Y-%m-%d"),
+        ]
+
+        async with async_session() as session:
+            result = await session.execute(
+                select(ScheduleCache).where(ScheduleCache.date_graph.in_(dates))
+            )
+            caches = result.scalars().all()
+
+        for cache in caches:
+            cache_time = cache.updated_at
+            if cache_time.tzinfo is None:
+                cache_time = cache_time.replace(tzinfo=timezone.utc)
+
+            memory_cache.set_schedule(
+                cache.date_graph, cache.group, json.loads(cache.times_json), cache_time
+            )
+
+        return len(caches)
+
+    @staticmethod
+    async def preload_users() -> int:
+        async with async_session() as session:
+            result = await session.execute(select(User.chat_id, User.group))
+            rows = result.all()
+
+        memory_cache.users = {chat_id: group for chat_id, group in rows}
+        memory_cache.users_loaded = True
+
+        return len(rows)
+
     async def get_schedule(self, group: str | None = None):
         target_group = group or settings.DEFAULT_GROUP
 
@@ -104,13 +151,16 @@ class PowerService:
         async with httpx.AsyncClient(
             headers=self.headers, follow_redirects=True, timeout=30.0
         ) as client:
-            response = await client.get(self.base_url, params=params)
+            with span("poweron.api"):
+                response = await client.get(self.base_url, params=params)
 
             if response.status_code == 200:
                 json_data = response.json()
                 events = json_data.get("hydra:member", [])
 
                 if events:
+                    fetched_at = datetime.now(timezone.utc)
+
                     for event in events:
                         raw_date = event.get("dateGraph")
                         if not raw_date:
@@ -123,6 +173,15 @@ class PowerService:
                         if isinstance(data_json, dict):
                             group_info = data_json.get(target_group)
 
+                            for group, info in data_json.items():
+                                if group != target_group and isinstance(info, dict):
+                                    memory_cache.set_schedule(
+                                        date_graph,
+                                        group,
+                                        info.get("times", {}),
+                                        fetched_at,
+                                    )
+
                         if date_graph and group_info and target_group:
                             await self.save_schedule_to_cache(
                                 date_graph, target_group, group_info.get("times", {})
@@ -141,10 +200,15 @@ class PowerService:
         date_str = date.strftime("%Y-%m-%d")
         date_display = format_date_ua(date)
 
-        async with async_session() as session:
-            result = await session.execute(select(User).where(User.chat_id == chat_id))
-            user = result.scalar_one_or_none()
-            user_group = user.group if user else settings.DEFAULT_GROUP
+        if memory_cache.users_loaded:
+            user_group = memory_cache.users.get(chat_id, settings.DEFAULT_GROUP)
+        else:
+            async with async_session() as session:
+                result = await session.execute(
+                    select(User).where(User.chat_id == chat_id)
+                )
+                user = result.scalar_one_or_none()
+                user_group = user.group if user else settings.DEFAULT_GROUP
 
         cached_times, updated_at = await self.get_schedule_from_cache(
             date_str, user_group
@@ -160,26 +224,39 @@ class PowerService:
         if cached_times is None or updated_at is None:
             return f"❌ **Графіка на {date_display} ще немає**", False
 
-        readable_text = format_schedule(cached_times)
+        caption = self.build_caption(date, user_group, cached_times, updated_at)
+
+        return caption, True
+
+    @staticmethod
+    def build_caption(
+        date: datetime,
+        group: str,
+        times: dict,
+        updated_at: datetime,
+        with_status: bool = True,
+    ) -> str:
+        date_str = date.strftime("%Y-%m-%d")
+        date_display = format_date_ua(date)
+
+        readable_text = memory_cache.render(date_str, group, times)
         current_status_text = ""
         now = datetime.now()
 
-        if date.date() == now.date():
-            status = get_current_status(cached_times)
+        if with_status and date.date() == now.date():
+            status = get_current_status(times)
             if status:
                 current_status_text = f"⚡️ **Зараз:** {status}\n"
 
         kyiv_tz = ZoneInfo("Europe/Kyiv")
         db_time_kyiv = updated_at.astimezone(kyiv_tz)
 
-        caption = (
+        return (
             f"📅 **Графік на {date_display}**\n"
-            f"🏘 Група: **{user_group}**\n"
+            f"🏘 Група: **{group}**\n"
             f"{current_status_text}"
             f"⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯\n"
             f"{readable_text}\n"
             f"⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯\n"
             f"💡 _Оновлено о {db_time_kyiv.strftime('%H:%M')}_"
         )
-
-        return caption, True
@@ -0,0 +1,41 @@
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class LoopProfiler:
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.running = False
+
+    async def capture(self, seconds: float) -> str:
+        self.running = True
+        try:
+            return await asyncio.to_thread(self._sample, threading.get_ident(), seconds)
+        finally:
+            self.running = False
+
+    def _sample(self, thread_id: int, seconds: float) -> str:
+        stacks: Counter[str] = Counter()
+        deadline = time.monotonic() + seconds
+
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(thread_id)
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+
+            if stack:
+                stacks[";".join(reversed(stack))] += 1
+
+            time.sleep(self.interval)
+
+        return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+
+
+profiler = LoopProfiler()
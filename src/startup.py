@@ -0,0 +1,57 @@
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+
+from src.config import settings
+from src.logger import setup_logger
+
+logger = setup_logger(__name__, settings.LOG_LEVEL)
+
+
+class StartupState:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.phases: Dict[str, float] = {}
+        self.current: str | None = None
+        self.error: str | None = None
+        self.ready_after: float | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_after is not None
+
+    @property
+    def status(self) -> str:
+        if self.error:
+            return "failed"
+        return "ready" if self.ready else "starting"
+
+    @asynccontextmanager
+    async def phase(self, name: str):
+        self.current = name
+        start = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self.error = f"{name}: {e}"
+            raise
+        finally:
+            self.phases[name] = round((time.monotonic() - start) * 1000, 2)
+            self.current = None
+            logger.info(f"Startup phase '{name}' took {self.phases[name]} ms")
+
+    def mark_ready(self):
+        self.ready_after = round((time.monotonic() - self.started) * 1000, 2)
+        logger.info(f"Bot is ready in {self.ready_after} ms")
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "current_phase": self.current,
+            "phases_ms": self.phases,
+            "ready_after_ms": self.ready_after,
+            "error": self.error,
+        }
+
+
+startup = StartupState()
@@ -1,13 +1,15 @@
 from aiogram import Router, types, F
 from aiogram.filters import Command
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from sqlalchemy import select
 
 from src.config import settings
 from src.logger import setup_logger
 from src.database.engine import async_session
 from src.database.models import User
+from src.poweron.cache import CACHE_TTL, memory_cache
 from src.poweron.service import PowerService
+from src.poweron.utils import format_date_ua
 from src.telegram.utils import get_main_keyboard
 
 router = Router()
@@ -29,6 +31,7 @@ async def cmd_start(message: types.Message):
             new_user = User(chat_id=message.from_user.id, group=settings.DEFAULT_GROUP)
             session.add(new_user)
             await session.commit()
+            memory_cache.users[new_user.chat_id] = new_user.group
             await message.answer(
                 "👋 Вітаю!\n\n"
                 f"🏘 Ваша група: **{settings.DEFAULT_GROUP}**\n\n"
@@ -56,6 +59,8 @@ async def cmd_help(message: types.Message):
         "• /today - графік на сьогодні\n"
         "• /tomorrow - графік на завтра\n"
         "Також ви можете просто написати **сьогодні** або **завтра**\n\n"
+        "Щоб поділитися графіком у будь-якому чаті, напишіть ім'я бота "
+        "та номер групи, наприклад: **@бот 3.2 завтра**\n\n"
         "**Позначення:**\n"
         "🟢 Світло є\n"
         "🔴 Немає світла\n"
@@ -99,3 +104,78 @@ async def text_today(message: types.Message):
 @router.message(F.text.lower().in_(["🔜 завтра", "завтра"]))
 async def text_tomorrow(message: types.Message):
     await get_tomorrow_schedule(message)
+
+
+def parse_inline_dates(word: str | None) -> list[datetime]:
+    today = datetime.now()
+    tomorrow = today + timedelta(days=1)
+
+    if word in ("сьогодні", "today"):
+        return [today]
+    if word in ("завтра", "tomorrow"):
+        return [tomorrow]
+    if word:
+        for year in (today.year, today.year + 1):
+            try:
+                parsed = datetime.strptime(f"{word}.{year}", "%d.%m.%Y")
+            except ValueError:
+                continue
+            if parsed.date() >= today.date():
+                return [parsed]
+        return []
+
+    return [today, tomorrow]
+
+
+@router.inline_query()
+async def inline_schedule(query: types.InlineQuery):
+    words = query.query.strip().lower().split()
+    prefix = words[0] if words else ""
+    dates = parse_inline_dates(words[1] if len(words) > 1 else None)
+
+    now_utc = datetime.now(timezone.utc)
+    results = []
+
+    for group in memory_cache.match_groups(prefix):
+        for date in dates:
+            date_str = date.strftime("%Y-%m-%d")
+            times, updated_at = memory_cache.get_schedule(date_str, group)
+
+            if times is None or (now_utc - updated_at).total_seconds() >= CACHE_TTL:
+                continue
+
+            caption = PowerService.build_caption(
+                date, group, times, updated_at, with_status=False
+            )
+            results.append(
+                types.InlineQueryResultArticle(
+                    id=f"{group}:{date_str}",
+                    title=f"Група {group} — {format_date_ua(date)}",
+                    description="Надіслати графік відключень",
+                    input_message_content=types.InputTextMessageContent(
+                        message_text=caption, parse_mode="Markdown"
+                    ),
+                )
+            )
+
+    # Telegram caches answers per query string and we can't invalidate them,
+    # so don't let a cached answer outlive the next schedule refresh or
+    # midnight, when "today" and "tomorrow" shift
+    now = datetime.now()
+    midnight = (now + timedelta(days=1)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    # next_refresh is unset until the monitor loop finishes its first check
+    next_refresh = memory_cache.next_refresh or now
+    cache_time = min(
+        settings.INLINE_CACHE_TIME,
+        (midnight - now).total_seconds(),
+        (next_refresh - now).total_seconds(),
+    )
+
+    if not results:
+        cache_time = min(cache_time, 10)
+
+    await query.answer(
+        results[:50], cache_time=max(int(cache_time), 0), is_personal=False
+    )
@@ -1,22 +1,213 @@
+import asyncio
 import time
 from datetime import datetime, timezone, timedelta
 from typing import Any, Awaitable, Callable, Dict
-from aiogram import BaseMiddleware
-from aiogram.types import TelegramObject, Message
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.methods import TelegramMethod
+from aiogram.types import TelegramObject, Message, Update
 from sqlalchemy import select, delete
+from src.config import settings
+from src.logger import setup_logger
 from src.database.engine import async_session
 from src.database.models import BannedUser
+from src.tracing import span, start_trace, end_trace
+
+logger = setup_logger(__name__, settings.LOG_LEVEL)
+
+
+class ConcurrencyMiddleware(BaseMiddleware):
+    def __init__(
+        self,
+        limit: int = 8,
+        queue_size: int = 100,
+        chat_queue_size: int = 5,
+        drop_overflow: bool = True,
+        log_interval: int = 60,
+    ):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.chat_locks: Dict[int, asyncio.Lock] = {}
+        self.chat_pending: Dict[int, int] = {}
+        self.limit = limit
+        self.queue_size = queue_size
+        self.chat_queue_size = chat_queue_size
+        self.drop_overflow = drop_overflow
+        self.log_interval = log_interval
+
+        self.waiting = 0
+        self.active = 0
+        self.processed = 0
+        self.dropped = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+        self.last_report = 0.0
+        self.reported_dropped = 0
+        self.slow_waits = 0
+        self.interval_wait_max = 0.0
+        super().__init__()
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        chat = data.get("event_chat")
+        user = data.get("event_from_user")
+        key = chat.id if chat else user.id if user else None
+
+        if key is not None and self.chat_pending.get(key, 0) >= self.chat_queue_size:
+            self.dropped += 1
+            logger.debug(f"Too many pending updates from chat {key}, update dropped")
+            self._report_overload()
+            return None
+
+        if self.drop_overflow and self.waiting >= self.queue_size:
+            self.dropped += 1
+            logger.debug(
+                f"Update queue is full ({self.waiting} waiting), update dropped"
+            )
+            self._report_overload()
+            return None
+
+        enqueued = time.monotonic()
+
+        lock = None
+        if key is not None:
+            lock = self.chat_locks.setdefault(key, asyncio.Lock())
+            self.chat_pending[key] = self.chat_pending.get(key, 0) + 1
+
+        try:
+            await self._acquire(lock)
+            try:
+                return await self._process(handler, event, data, enqueued)
+            finally:
+                self.semaphore.release()
+                if lock is not None:
+                    lock.release()
+        finally:
+            if key is not None:
+                self.chat_pending[key] -= 1
+                if not self.chat_pending[key]:
+                    del self.chat_pending[key]
+                    del self.chat_locks[key]
+
+    async def _acquire(self, lock: asyncio.Lock | None):
+        with span("queue.wait"):
+            if lock is not None:
+                await lock.acquire()
+
+            # Only updates waiting for a global slot count against queue_size;
+            # updates queued behind their own chat are bounded by chat_queue_size
+            self.waiting += 1
+            try:
+                await self.semaphore.acquire()
+            except BaseException:
+                if lock is not None:
+                    lock.release()
+                raise
+            finally:
+                self.waiting -= 1
+
+    async def _process(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+        enqueued: float,
+    ) -> Any:
+        wait = time.monotonic() - enqueued
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        self.processed += 1
+
+        if wait > 1:
+            self.slow_waits += 1
+            self.interval_wait_max = max(self.interval_wait_max, wait)
+            logger.debug(f"Update waited {wait:.2f}s in queue")
+            self._report_overload()
+
+        self.active += 1
+        try:
+            return await handler(event, data)
+        finally:
+            self.active -= 1
+
+    def _report_overload(self):
+        # One summary per interval instead of a line per update during surges;
+        # exact counters are always available on /stats
+        now = time.monotonic()
+        if now - self.last_report < self.log_interval:
+            return
+
+        logger.warning(
+            f"Update queue overloaded: {self.dropped - self.reported_dropped} dropped, "
+            f"{self.slow_waits} waited over 1s "
+            f"(max {self.interval_wait_max * 1000:.0f} ms), "
+            f"{self.waiting} waiting now"
+        )
+        self.last_report = now
+        self.reported_dropped = self.dropped
+        self.slow_waits = 0
+        self.interval_wait_max = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        avg_wait = self.wait_total / self.processed if self.processed else 0.0
+        return {
+            "limit": self.limit,
+            "queue_size": self.queue_size,
+            "chat_queue_size": self.chat_queue_size,
+            "pending_chats": len(self.chat_pending),
+            "active": self.active,
+            "waiting": self.waiting,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "avg_wait_ms": round(avg_wait * 1000, 2),
+            "max_wait_ms": round(self.wait_max * 1000, 2),
+        }
 
 
 class AntiFloodMiddleware(BaseMiddleware):
     def __init__(self, limit: int = 10, window: int = 10, ban_time: int = 300):
         self.users: Dict[int, list[float]] = {}
         self.banned_cache: Dict[int, datetime] = {}
+        self.bans_loaded = False
         self.limit = limit
         self.window = window
         self.ban_time = ban_time
         super().__init__()
 
+    async def preload(self) -> int:
+        now_dt = datetime.now(timezone.utc)
+
+        async with async_session() as session:
+            result = await session.execute(select(BannedUser))
+            bans = result.scalars().all()
+
+            expired = []
+            for ban in bans:
+                until_date = ban.until_date
+                if until_date.tzinfo is None:
+                    until_date = until_date.replace(tzinfo=timezone.utc)
+
+                if now_dt < until_date:
+                    self.banned_cache[ban.chat_id] = until_date
+                else:
+                    expired.append(ban.chat_id)
+
+            if expired:
+                await session.execute(
+                    delete(BannedUser).where(BannedUser.chat_id.in_(expired))
+                )
+                await session.commit()
+
+        self.bans_loaded = True
+        return len(self.banned_cache)
+
     async def __call__(
         self,
         handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
@@ -36,47 +227,111 @@ class AntiFloodMiddleware(BaseMiddleware):
             else:
                 del self.banned_cache[user_id]
 
-        async with async_session() as session:
-            result = await session.execute(
-                select(BannedUser).where(BannedUser.chat_id == user_id)
-            )
-            ban_record = result.scalar_one_or_none()
+        if not self.bans_loaded:
+            async with async_session() as session:
+                result = await session.execute(
+                    select(BannedUser).where(BannedUser.chat_id == user_id)
+                )
+                ban_record = result.scalar_one_or_none()
 
-            if ban_record:
-                until_date = ban_record.until_date
-                if until_date.tzinfo is None:
-                    until_date = until_date.replace(tzinfo=timezone.utc)
+                if ban_record:
+                    until_date = ban_record.until_date
+                    if until_date.tzinfo is None:
+                        until_date = until_date.replace(tzinfo=timezone.utc)
 
-                if now_dt < until_date:
-                    self.banned_cache[user_id] = until_date
-                    return None
-                else:
-                    await session.execute(
-                        delete(BannedUser).where(BannedUser.chat_id == user_id)
-                    )
-                    await session.commit()
+                    if now_dt < until_date:
+                        self.banned_cache[user_id] = until_date
+                        return None
+                    else:
+                        await session.execute(
+                            delete(BannedUser).where(BannedUser.chat_id == user_id)
+                        )
+                        await session.commit()
 
-            if user_id not in self.users:
-                self.users[user_id] = []
+        if user_id not in self.users:
+            self.users[user_id] = []
 
-            self.users[user_id] = [
-                t for t in self.users[user_id] if now_ts - t < self.window
-            ]
-            self.users[user_id].append(now_ts)
+        self.users[user_id] = [
+            t for t in self.users[user_id] if now_ts - t < self.window
+        ]
+        self.users[user_id].append(now_ts)
 
-            if len(self.users[user_id]) > self.limit:
-                ban_until = now_dt + timedelta(seconds=self.ban_time)
+        if len(self.users[user_id]) > self.limit:
+            ban_until = now_dt + timedelta(seconds=self.ban_time)
 
-                self.banned_cache[user_id] = ban_until
+            self.banned_cache[user_id] = ban_until
 
+            async with async_session() as session:
                 new_ban = BannedUser(chat_id=user_id, until_date=ban_until)
                 await session.merge(new_ban)
                 await session.commit()
 
-                await event.answer(
-                    f"❌ **Ви заблоковані на {self.ban_time // 60} хв за спам!**",
-                    parse_mode="Markdown",
-                )
-                return None
+            await event.answer(
+                f"❌ **Ви заблоковані на {self.ban_time // 60} хв за спам!**",
+                parse_mode="Markdown",
+            )
+            return None
 
         return await handler(event, data)
+
+
+class TracingMiddleware(BaseMiddleware):
+    def __init__(self, slow_ms: int = 1000):
+        self.slow_ms = slow_ms
+        super().__init__()
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        name = f"update {event.update_id}" if isinstance(event, Update) else "update"
+        trace, token = start_trace(name)
+        try:
+            return await handler(event, data)
+        finally:
+            end_trace(trace, token)
+            if trace.duration * 1000 >= self.slow_ms:
+                logger.warning(f"Slow request:\n{trace.breakdown()}")
+
+
+class SpanMiddleware(BaseMiddleware):
+    def __init__(self, middleware: BaseMiddleware):
+        self.middleware = middleware
+        self.name = type(middleware).__name__
+        super().__init__()
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        with span(self.name):
+            return await self.middleware(handler, event, data)
+
+
+class HandlerSpanMiddleware(BaseMiddleware):
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        handler_object = data.get("handler")
+        name = handler_object.callback.__name__ if handler_object else "unknown"
+
+        with span(f"handler.{name}"):
+            return await handler(event, data)
+
+
+class TracingRequestMiddleware(BaseRequestMiddleware):
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType,
+        bot: Bot,
+        method: TelegramMethod,
+    ):
+        with span(f"telegram.{method.__api_method__}"):
+            return await make_request(bot, method)
@@ -0,0 +1,139 @@
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class Span:
+    __slots__ = ("name", "parent", "depth", "start", "duration", "children")
+
+    def __init__(self, name: str, parent: "Span | None", start: float):
+        self.name = name
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent else 0
+        self.start = start
+        self.duration = 0.0
+        self.children = 0.0
+
+    @property
+    def self_time(self) -> float:
+        return max(self.duration - self.children, 0.0)
+
+
+class Trace:
+    def __init__(self, name: str):
+        self.name = name
+        self.root = Span(name, None, time.perf_counter())
+        self.spans: list[Span] = []
+
+    @property
+    def duration(self) -> float:
+        return self.root.duration
+
+    def finish(self):
+        self.root.duration = time.perf_counter() - self.root.start
+
+    def open(self, name: str, parent: Span | None = None) -> Span:
+        parent = parent or _current_span.get() or self.root
+        span = Span(name, parent, time.perf_counter())
+        self.spans.append(span)
+        return span
+
+    @staticmethod
+    def close(span: Span):
+        span.duration = time.perf_counter() - span.start
+        span.parent.children += span.duration
+
+    def breakdown(self) -> str:
+        lines = [f"{self.name}: {self.duration * 1000:.1f} ms"]
+        for span in sorted(self.spans, key=lambda s: s.start):
+            line = f"{'  ' * span.depth}{span.name}: {span.duration * 1000:.1f} ms"
+            if span.children:
+                line += f" (self {span.self_time * 1000:.1f} ms)"
+            lines.append(line)
+
+        return "\n".join(lines)
+
+
+_current_trace: ContextVar[Trace | None] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+_NULL_SPAN = nullcontext()
+
+
+class _SpanContext:
+    __slots__ = ("trace", "name", "span", "token")
+
+    def __init__(self, trace: Trace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.span = self.trace.open(self.name)
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, *exc: Any):
+        self.trace.close(self.span)
+        _current_span.reset(self.token)
+        return False
+
+
+def span(name: str):
+    trace = _current_trace.get()
+    if trace is None:
+        return _NULL_SPAN
+
+    return _SpanContext(trace, name)
+
+
+def start_trace(name: str) -> tuple[Trace, Any]:
+    trace = Trace(name)
+    return trace, _current_trace.set(trace)
+
+
+def end_trace(trace: Trace, token: Any):
+    trace.finish()
+    _current_trace.reset(token)
+
+
+def instrument_engine(engine: AsyncEngine):
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info.pop("trace_span", None)
+        trace = _current_trace.get()
+        if trace is not None:
+            connection_record.info["trace_span"] = (trace, trace.open("db.session"))
+
+    @event.listens_for(sync_engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        traced = connection_record.info.pop("trace_span", None)
+        if traced is not None:
+            traced[0].close(traced[1])
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        traced = conn.info.get("trace_span")
+        if traced is not None and context is not None:
+            operation = statement.lstrip().split(" ", 1)[0].upper()
+            context.trace_query = traced[0].open(f"db.{operation}", parent=traced[1])
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        query = getattr(context, "trace_query", None)
+        if query is not None:
+            Trace.close(query)
+            context.trace_query = None
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        context = exception_context.execution_context
+        query = getattr(context, "trace_query", None)
+        if query is not None:
+            Trace.close(query)
+            context.trace_query = None